@@ -5,4 +5,18 @@ class CoreConfig(AppConfig):
     """Конфигурация основного приложения"""
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
-    verbose_name = 'Основная функциональность'
\ No newline at end of file
+    verbose_name = 'Основная функциональность'
+
+    def ready(self):
+        """Ускорение декодирования JSON-колонок"""
+        # psycopg2 по умолчанию декодирует json/jsonb stdlib-ным json.loads;
+        # orjson делает то же на C - выигрыш на каждой строке с
+        # payload_json/sources_json
+        try:
+            import orjson
+            from psycopg2.extras import register_default_json, register_default_jsonb
+
+            register_default_json(loads=orjson.loads, globally=True)
+            register_default_jsonb(loads=orjson.loads, globally=True)
+        except ImportError:
+            pass
\ No newline at end of file
@@ -1,6 +1,9 @@
 """
 Кастомные исключения и обработчики ошибок для API
 """
+from django.db import IntegrityError
+from rest_framework import status
+from rest_framework.response import Response
 from rest_framework.views import exception_handler
 import logging
 
@@ -75,6 +78,24 @@ def custom_exception_handler(exc, context):
     """
     Кастомный обработчик исключений для единого формата ошибок API
     """
+    # Нарушение CHECK-ограничения БД (например, start_dt > end_dt) -
+    # это ошибка данных запроса, а не сбой сервера
+    if isinstance(exc, IntegrityError):
+        logger.warning("Integrity error: %s", exc)
+        if 'valid_date_range' in str(exc):
+            message = "Дата начала не может быть позже даты окончания"
+        else:
+            message = ERROR_CODES['VALIDATION_ERROR']
+        return Response({
+            'success': False,
+            'data': None,
+            'error': {
+                'code': 'VALIDATION_ERROR',
+                'message': message,
+                'details': {'error': str(exc)}
+            }
+        }, status=status.HTTP_400_BAD_REQUEST)
+
     # Вызываем стандартный обработчик DRF
     response = exception_handler(exc, context)
     
@@ -0,0 +1,55 @@
+"""
+Переиспользуемые примеси для API views
+"""
+
+
+class SerializerOnlyFieldsMixin:
+    """
+    Автоматическое сужение выборки колонок по полям сериализатора
+
+    Списочные endpoints читают `SELECT *`, хотя сериализаторы отдают
+    фиксированный набор полей. Примесь выводит кортеж для `.only()`
+    из полей сериализатора (один раз на класс view), чтобы не гонять
+    лишние колонки из БД и не материализовывать их в Python.
+
+    Поля, которые сериализатор читает мимо одного атрибута модели
+    (SerializerMethodField с source='*', вложенные source через точку),
+    в кортеж не попадают - их зависимости перечисляются вручную
+    в `only_extra_fields` (например, FK, уже накрытый select_related).
+    """
+
+    only_extra_fields = ()
+
+    _only_fields_cache = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        only_fields = SerializerOnlyFieldsMixin._only_fields_cache.get(self.__class__)
+        if only_fields is None:
+            only_fields = self._build_only_fields(queryset.model)
+            SerializerOnlyFieldsMixin._only_fields_cache[self.__class__] = only_fields
+        if only_fields:
+            queryset = queryset.only(*only_fields)
+        return queryset
+
+    def _build_only_fields(self, model):
+        """Собрать кортеж имён модельных полей, нужных сериализатору"""
+        by_name = {field.name: field for field in model._meta.concrete_fields}
+        by_attname = {field.attname: field for field in model._meta.concrete_fields}
+
+        only_fields = []
+        serializer = self.get_serializer_class()()
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source or name
+            if source == '*' or '.' in source:
+                continue
+            model_field = by_name.get(source) or by_attname.get(source)
+            if model_field is None:
+                continue
+            only_fields.append(model_field.name)
+
+        only_fields.extend(self.only_extra_fields)
+        # dict сохраняет порядок и убирает дубли
+        return tuple(dict.fromkeys(only_fields))
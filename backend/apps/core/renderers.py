@@ -0,0 +1,25 @@
+"""
+Рендереры API
+"""
+import orjson
+from rest_framework.renderers import BaseRenderer
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON-рендерер на orjson
+
+    C-реализация кодирования в разы быстрее stdlib json и отдаёт
+    сразу UTF-8 байты - кириллица не экранируется. default=str
+    страхует нестандартные типы (lazy-строки, Decimal и т.п.).
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=str)
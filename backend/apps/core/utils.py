@@ -0,0 +1,37 @@
+"""
+Вспомогательные утилиты ядра
+"""
+from datetime import date
+from functools import lru_cache
+
+
+@lru_cache(maxsize=512)
+def parse_ddmmyyyy(value):
+    """
+    Разбор даты в формате DD-MM-YYYY без strptime
+
+    strptime каждый раз интерпретирует строку формата; для одного
+    фиксированного формата достаточно split по дефису. Как и strptime,
+    принимает значения без ведущих нулей ('1-01-2026') и бросает
+    ValueError для некорректных строк. Кеш превращает повторные
+    значения фильтров (обычно их единицы) в O(1).
+    """
+    try:
+        day, month, year = value.split('-')
+    except ValueError:
+        raise ValueError(f"Дата должна быть в формате DD-MM-YYYY: {value!r}")
+    if len(year) != 4:
+        raise ValueError(f"Год должен быть четырёхзначным: {value!r}")
+    return date(int(year), int(month), int(day))
+
+
+@lru_cache(maxsize=4096)
+def format_ddmmyyyy(value):
+    """
+    Форматирование даты в DD-MM-YYYY через f-строку
+
+    Быстрее strftime (без разбора строки формата и вызова C-локали),
+    а кеш окупается на экспортах: даты плана сильно повторяются
+    между строками.
+    """
+    return f"{value.day:02d}-{value.month:02d}-{value.year:04d}"
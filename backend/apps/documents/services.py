@@ -3,13 +3,22 @@
 """
 import hashlib
 import logging
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Iterable, Iterator, Optional, Any, Tuple
 from datetime import datetime, date, timedelta
 from dataclasses import dataclass
 from pathlib import Path
 
+import openpyxl
 import pandas as pd
+
+try:
+    # Rust-парсер xlsx: распаковка и разбор XML идут вне Python,
+    # на больших планах это на порядок быстрее openpyxl
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
 from docx import Document
+from asgiref.sync import sync_to_async
 from django.core.files.uploadedfile import UploadedFile
 from django.conf import settings
 
@@ -54,8 +63,13 @@ class ExcelProcessorService:
             # Валидация файла
             self._validate_file(uploaded_file)
             
-            # Вычисление хеша файла
-            file_hash = self._calculate_file_hash(uploaded_file)
+            # Вычисление хеша файла. Под ASGI корутина выполняется в event
+            # loop воркера, поэтому блокирующие чтение и парсинг файла
+            # уводим в thread-пул - иначе загрузка плана стопорит SSE-потоки
+            # и все остальные запросы процесса
+            file_hash = await sync_to_async(
+                self._calculate_file_hash, thread_sensitive=False
+            )(uploaded_file)
             
             # Проверка дубликатов
             if await self._is_duplicate_file(file_hash):
@@ -71,17 +85,16 @@ class ExcelProcessorService:
                     metadata={'duplicate': True}
                 )
             
-            # Чтение Excel файла
+            # Чтение Excel файла (потоково, без полного DOM в памяти)
             try:
-                df = pd.read_excel(
-                    uploaded_file,
-                    engine='openpyxl' if uploaded_file.name.endswith('.xlsx') else 'xlrd'
-                )
+                headers, rows = await sync_to_async(
+                    self._read_excel_rows, thread_sensitive=False
+                )(uploaded_file)
             except Exception as e:
                 raise FileProcessingError(f"Не удалось прочитать Excel файл: {e}")
-            
+
             # Обработка данных
-            tasks_created, tasks_updated, date_warnings = await self._process_plan_data(df, uploaded_file.name)
+            tasks_created, tasks_updated, date_warnings = await self._process_plan_data(headers, rows, uploaded_file.name)
             items_created = tasks_created + tasks_updated
             warnings.extend(date_warnings)
             
@@ -166,19 +179,70 @@ class ExcelProcessorService:
     async def _is_duplicate_file(self, file_hash: str) -> bool:
         """Проверка, не обрабатывался ли файл ранее"""
         return await FileDigest.objects.filter(sha256=file_hash).aexists()
-    
-    async def _process_plan_data(self, df: pd.DataFrame, filename: str) -> Tuple[int, int, List[str]]:
+
+    def _read_excel_rows(self, uploaded_file: UploadedFile) -> Tuple[List[str], Iterator[tuple]]:
+        """
+        Чтение заголовков и строк Excel файла
+
+        Для .xlsx приоритет у calamine (типизированные значения приходят
+        сразу, без повторного парсинга дат); при его отсутствии - openpyxl
+        в режиме read_only: строки отдаются потоково, без построения
+        полного DOM книги в памяти. Для устаревших .xls остаётся pandas/xlrd.
+        """
+        if uploaded_file.name.lower().endswith('.xlsx'):
+            if CalamineWorkbook is not None:
+                workbook = CalamineWorkbook.from_filelike(uploaded_file)
+                rows = iter(workbook.get_sheet_by_index(0).to_python(skip_empty_area=True))
+                header_row = next(rows, None)
+                if header_row is None:
+                    return [], iter(())
+                headers = ['' if cell is None else str(cell) for cell in header_row]
+                return headers, rows
+
+            workbook = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+            rows = workbook.active.iter_rows(values_only=True)
+            header_row = next(rows, None)
+            if header_row is None:
+                return [], iter(())
+            headers = ['' if cell is None else str(cell) for cell in header_row]
+            return headers, rows
+
+        df = pd.read_excel(uploaded_file, engine='xlrd')
+        headers = [str(col) for col in df.columns]
+        return headers, df.itertuples(index=False, name=None)
+
+    def _collect_tasks(self, headers: List[str], rows: Iterable[tuple], column_mapping: Dict[str, str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Сбор задач из строк файла (синхронный, выполняется в thread-пуле)"""
+        collected: List[Dict[str, Any]] = []
+        warnings: List[str] = []
+        for index, row in enumerate(rows):
+            try:
+                row_data = dict(zip(headers, row))
+                task_data = self._extract_task_from_row(row_data, column_mapping, index)
+                if not task_data:
+                    continue
+                collected.append({
+                    **task_data,
+                    'row_index': index  # на случай одинаковых стартов — стабильная сортировка
+                })
+                warnings.extend(task_data.get('warnings', []))
+            except Exception as e:
+                logger.warning(f"Failed to process row {index}: {e}")
+                continue
+        return collected, warnings
+
+    async def _process_plan_data(self, headers: List[str], rows: Iterable[tuple], filename: str) -> Tuple[int, int, List[str]]:
         """Обработка данных плана производства: сбор -> коррекция -> запись"""
         tasks_created = 0
         tasks_updated = 0
         all_warnings: List[str] = []
 
-        column_mapping = self._map_columns(df.columns.tolist())
+        column_mapping = self._map_columns(headers)
         if not all(key in column_mapping for key in ['task', 'product', 'start', 'end']):
             expected_headers = ['Произ. Задание', 'Продукт', 'Начало выполнения', 'Завершение выполнения']
             raise FileProcessingError(
                 f"Не найдены обязательные колонки. Ожидаемые заголовки: {expected_headers}. "
-                f"Найденные колонки: {list(df.columns)}"
+                f"Найденные колонки: {headers}"
             )
 
         # Одна линия по умолчанию (как и было)
@@ -190,21 +254,13 @@ class ExcelProcessorService:
             }
         )
 
-        # 1) Сбор задач без записи в БД
-        collected: List[Dict[str, Any]] = []
-        for index, row in df.iterrows():
-            try:
-                task_data = self._extract_task_from_row(row, column_mapping, index)
-                if not task_data:
-                    continue
-                collected.append({
-                    **task_data,
-                    'row_index': index  # на случай одинаковых стартов — стабильная сортировка
-                })
-                all_warnings.extend(task_data.get('warnings', []))
-            except Exception as e:
-                logger.warning(f"Failed to process row {index}: {e}")
-                continue
+        # 1) Сбор задач без записи в БД. Ленивые итераторы (openpyxl
+        #    read_only) парсят строки прямо при обходе - обход тоже
+        #    выполняется в thread-пуле, а не в event loop
+        collected, collect_warnings = await sync_to_async(
+            self._collect_tasks, thread_sensitive=False
+        )(headers, rows, column_mapping)
+        all_warnings.extend(collect_warnings)
 
         if not collected:
             return 0, 0, all_warnings
@@ -252,29 +308,59 @@ class ExcelProcessorService:
             t['start_date'], t['end_date'] = sd, ed
             prev_end = ed if (prev_end is None or ed > prev_end) else prev_end
 
-        # 4) Запись в БД
-        for t in collected:
-            product, _ = await Product.objects.aget_or_create(
-                name=t['product_name'],
+        # 4) Запись в БД: справочники и существующие задачи читаем по одному
+        #    запросу, задачи пишем пачками вместо пары запросов на строку
+        product_names = {t['product_name'] for t in collected}
+        products = {
+            p.name: p
+            async for p in Product.objects.filter(name__in=product_names)
+        }
+        for name in product_names - products.keys():
+            # Создаём по одному: save() генерирует код продукта
+            products[name], _ = await Product.objects.aget_or_create(
+                name=name,
                 defaults={'description': f'Создан автоматически из файла {filename}'}
             )
 
-            task, created = await PlanTask.objects.aupdate_or_create(
-                production_line=line,
-                product=product,
-                title=t['title'],
-                defaults={
-                    'start_dt': t['start_date'],
-                    'end_dt': t['end_date'],
-                    'source': 'excel'
-                }
-            )
-            if created:
-                tasks_created += 1
-                logger.debug(f"Created task: {task.title} ({task.start_dt} - {task.end_dt})")
+        existing = {}
+        async for task in PlanTask.objects.filter(production_line=line):
+            existing[(task.product_id, task.title)] = task
+
+        to_create: List[PlanTask] = []
+        to_update: List[PlanTask] = []
+        update_ids = set()
+        for t in collected:
+            product = products[t['product_name']]
+            task = existing.get((product.id, t['title']))
+            if task is None:
+                task = PlanTask(
+                    production_line=line,
+                    product=product,
+                    title=t['title'],
+                    start_dt=t['start_date'],
+                    end_dt=t['end_date'],
+                    source='excel'
+                )
+                to_create.append(task)
+                existing[(product.id, t['title'])] = task
             else:
-                tasks_updated += 1
-                logger.debug(f"Updated task: {task.title} ({task.start_dt} - {task.end_dt})")
+                task.start_dt = t['start_date']
+                task.end_dt = t['end_date']
+                task.source = 'excel'
+                if task.pk is not None and task.pk not in update_ids:
+                    update_ids.add(task.pk)
+                    to_update.append(task)
+
+        if to_create:
+            await PlanTask.objects.abulk_create(to_create, batch_size=1000)
+        if to_update:
+            await PlanTask.objects.abulk_update(
+                to_update, ['start_dt', 'end_dt', 'source'], batch_size=1000
+            )
+
+        tasks_created = len(to_create)
+        tasks_updated = len(to_update)
+        logger.debug("Plan tasks written: %s created, %s updated", tasks_created, tasks_updated)
 
         return tasks_created, tasks_updated, all_warnings
     
@@ -349,18 +435,18 @@ class ExcelProcessorService:
         logger.debug(f"Available columns: {columns}")
         return column_mapping
     
-    def _extract_task_from_row(self, row: pd.Series, column_mapping: Dict[str, str], row_index: int) -> Optional[Dict[str, Any]]:
+    def _extract_task_from_row(self, row: Dict[str, Any], column_mapping: Dict[str, str], row_index: int) -> Optional[Dict[str, Any]]:
         """Извлечение данных задачи из строки Excel"""
-        
+
         try:
             # Извлекаем значения
             task_title = str(row[column_mapping['task']]).strip()
             product_name = str(row[column_mapping['product']]).strip()
             start_date_val = row[column_mapping['start']]
             end_date_val = row[column_mapping['end']]
-            
+
             # Пропускаем пустые строки
-            if pd.isna(task_title) or task_title.lower() in ['nan', '', 'none']:
+            if task_title.lower() in ['nan', '', 'none']:
                 return None
             
             # Парсинг дат с получением предупреждений
@@ -402,7 +488,11 @@ class ExcelProcessorService:
             # Если уже datetime
             if isinstance(date_val, (datetime, pd.Timestamp)):
                 return date_val.date(), warnings
-            
+
+            # calamine отдаёт даты сразу объектами date
+            if isinstance(date_val, date):
+                return date_val, warnings
+
             # Если строка в формате DD.MM.YYYY
             if isinstance(date_val, str):
                 date_str = date_val.strip()
@@ -98,6 +98,10 @@ class LLMExtractionService:
         self.extra_line_synonyms: Dict[str, List[str]] = getattr(
             settings, "LINE_SYNONYMS", {}
         )
+        # Предкомпилированная альтернация синонимов из настроек:
+        # один проход regex по тексту вместо цикла по всем синонимам
+        self.line_synonyms_pattern = getattr(settings, "LINE_SYNONYMS_PATTERN", None)
+        self.line_synonyms_by_text = getattr(settings, "LINE_SYNONYMS_BY_TEXT", {})
 
         self.llm_client = self._create_llm_client()
         self.parser = PydanticOutputParser(pydantic_object=DowntimeExtraction)
@@ -450,7 +454,15 @@ class LLMExtractionService:
         if m:
             return f"Линия_{int(m.group(1))}"
 
-        # 3) "66-й" без слова "линия", но рядом есть маркеры простоя (и НЕ единицы измерения)
+        # 3) синонимы из настроек одним проходом предкомпилированной альтернации
+        if self.line_synonyms_pattern:
+            m = self.line_synonyms_pattern.search(t)
+            if m:
+                hit = self.line_synonyms_by_text.get(m.group(0).lower())
+                if hit:
+                    return hit
+
+        # 4) "66-й" без слова "линия", но рядом есть маркеры простоя (и НЕ единицы измерения)
         DOWNTIME_MARKERS = r"(просто\w*|останов\w*|обслужив\w*|ремон\w*|модерниз\w*|пауза\w*|окно\w*|сервис\w*|регламентн\w*|переборк\w*|вывед\w*\s+из\s+работы)"
         NEG_NEAR_NUM = r"\b(дн[ея]|день|сут(?:ки|ок)?|час(?:ов|а)?|мин(?:ут)?|кг|г|мм|см|шт)\b"
 
@@ -1,6 +1,7 @@
 """
 Модели для системы уведомлений и конфликтов
 """
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 import hashlib
 import json
@@ -67,6 +68,8 @@ class Notification(models.Model):
         verbose_name_plural = 'Уведомления'
         indexes = [
             models.Index(fields=['-created_at']),
+            # BRIN дешёвый для append-only таблицы, упорядоченной по времени
+            BrinIndex(fields=['created_at']),
             models.Index(fields=['level']),
             models.Index(fields=['code']),
             models.Index(fields=['unique_key']),
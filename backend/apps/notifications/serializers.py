@@ -9,25 +9,21 @@ class NotificationSerializer(serializers.ModelSerializer):
     """Сериализатор для уведомлений"""
     
     created_at = serializers.DateTimeField(format='%d-%m-%Y %H:%M:%S', read_only=True)
-    
+
+    # В API поле называется payload, в модели - payload_json
+    payload = serializers.JSONField(source='payload_json', read_only=True)
+    payload_json = serializers.JSONField(required=False, write_only=True)
+
     class Meta:
         model = Notification
         fields = [
             'id',
-            'created_at', 
+            'created_at',
             'level',
             'code',
             'text',
+            'payload',
             'payload_json',
             'unique_key'
         ]
-        read_only_fields = ['id', 'created_at', 'unique_key']
-    
-    def to_representation(self, instance):
-        """Кастомное представление для API"""
-        data = super().to_representation(instance)
-        
-        # Переименовываем payload_json в payload для удобства
-        data['payload'] = data.pop('payload_json', {})
-        
-        return data
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'unique_key']
\ No newline at end of file
@@ -1,9 +1,10 @@
 """
 API views для системы уведомлений
 """
+import asyncio
 import json
 import logging
-import time
+from asgiref.sync import sync_to_async
 from django.http import StreamingHttpResponse
 from django.db import connection, close_old_connections
 from rest_framework.decorators import api_view, renderer_classes
@@ -30,72 +31,99 @@ def _format_sse_message(event_type: str, data: dict, event_id: str = None) -> st
     return message
 
 
-def _sse_notification_stream(since_id: int = None):
+def _notification_frame(notification_id, created_at, level, code, text, payload_json,
+                        _dumps=json.dumps) -> str:
     """
-    Генератор SSE потока для уведомлений
+    Специализированный сборщик SSE-кадра под фиксированный набор колонок
+
+    Состав колонок в запросе потока не меняется, поэтому кадр собирается
+    напрямую, без промежуточного dict и общего _format_sse_message.
+    """
+    return (
+        f'id: {notification_id}\n'
+        f'event: notification\n'
+        f'data: {{"id":{notification_id},'
+        f'"created_at":{_dumps(created_at.isoformat()) if created_at else "null"},'
+        f'"level":{_dumps(level, ensure_ascii=False)},'
+        f'"code":{_dumps(code, ensure_ascii=False)},'
+        f'"text":{_dumps(text, ensure_ascii=False)},'
+        f'"payload":{_dumps(payload_json or {}, ensure_ascii=False)}}}\n\n'
+    )
+
+
+def _fetch_new_notifications(last_id: int):
+    """Синхронная выборка новых уведомлений (выполняется в thread-пуле)"""
+    close_old_connections()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT id, created_at, level, code, text, payload_json
+            FROM notifications
+            WHERE id > %s
+            ORDER BY id ASC
+            LIMIT 100
+            """,
+            [last_id]
+        )
+        return cursor.fetchall()
+
+
+async def _sse_notification_stream(since_id: int = None):
+    """
+    Асинхронный генератор SSE потока для уведомлений
+
+    Под ASGI (gunicorn -k uvicorn.workers.UvicornWorker) открытое
+    SSE-соединение живёт в event loop и не занимает поток воркера
+    между опросами - тысячи клиентов делят один процесс. Блокирующий
+    опрос БД уходит в thread-пул через sync_to_async.
     """
     yield ": sse connected\n\n"
     last_id = since_id or 0
     heartbeat_counter = 0
-    
-    logger.info(f"SSE stream started with since_id={since_id}")
-    
+
+    logger.info("SSE stream started with since_id=%s", since_id)
+
     try:
         while True:
-            # Проверяем новые уведомления
-            close_old_connections()
             try:
-                with connection.cursor() as cursor:
-                    cursor.execute(
-                        """
-                        SELECT id, created_at, level, code, text, payload_json 
-                        FROM notifications 
-                        WHERE id > %s 
-                        ORDER BY id ASC 
-                        LIMIT 100
-                        """,
-                        [last_id]
-                    )
-                    rows = cursor.fetchall()
-                
+                # Проверяем новые уведомления. thread_sensitive=False:
+                # опрос идёт в общий thread-пул, а не в единственный
+                # sync-поток воркера, где медленный sync-запрос застопорил
+                # бы все открытые SSE-потоки; за коннекты БД в чужих
+                # потоках отвечает close_old_connections внутри выборки
+                rows = await sync_to_async(
+                    _fetch_new_notifications, thread_sensitive=False
+                )(last_id)
+
                 # Отправляем новые уведомления
                 for row in rows:
-                    notification_id, created_at, level, code, text, payload_json = row
-                    
-                    notification_data = {
-                        'id': notification_id,
-                        'created_at': created_at.isoformat() if created_at else None,
-                        'level': level,
-                        'code': code,
-                        'text': text,
-                        'payload': payload_json or {}
-                    }
-                    
-                    yield _format_sse_message('notification', notification_data, str(notification_id))
-                    last_id = max(last_id, notification_id)
-                
+                    yield _notification_frame(*row)
+                    last_id = max(last_id, row[0])
+
                 # Отправляем heartbeat каждые 15 секунд (7-8 итераций по 2 секунды)
                 heartbeat_counter += 1
                 if heartbeat_counter % 8 == 0:
                     yield ": keepalive\n\n"
                     heartbeat_counter = 0
-                
-                time.sleep(2)  # Опрос каждые 2 секунды
-                
+
+                await asyncio.sleep(2)  # Опрос каждые 2 секунды
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                logger.error(f"SSE stream error: {str(e)}", exc_info=True)
+                logger.error("SSE stream error: %s", e, exc_info=True)
                 # Отправляем ошибку клиенту
                 error_data = {
                     'error': 'Ошибка получения уведомлений',
                     'details': str(e)
                 }
                 yield _format_sse_message('error', error_data)
-                time.sleep(5)  # Больше пауза при ошибке
-                
-    except GeneratorExit:
+                await asyncio.sleep(5)  # Больше пауза при ошибке
+
+    except (GeneratorExit, asyncio.CancelledError):
         logger.info("SSE stream closed by client")
     except Exception as e:
-        logger.error(f"SSE stream fatal error: {str(e)}", exc_info=True)
+        logger.error("SSE stream fatal error: %s", e, exc_info=True)
 
 
 @api_view(['GET'])
@@ -114,7 +142,7 @@ def notification_stream(request):
         else:
             since_id = 0
             
-        logger.info(f"Starting SSE stream for notifications since_id={since_id}")
+        logger.info("Starting SSE stream for notifications since_id=%s", since_id)
         
         response = StreamingHttpResponse(
             _sse_notification_stream(since_id),
@@ -138,7 +166,7 @@ def notification_stream(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     except Exception as e:
-        logger.error(f"SSE stream initialization failed: {str(e)}", exc_info=True)
+        logger.error("SSE stream initialization failed: %s", e, exc_info=True)
         return Response({
             'success': False,
             'error': {
@@ -156,35 +184,60 @@ def list_notifications(request):
     
     Параметры:
     - limit: количество записей (по умолчанию 50)
-    - offset: смещение (по умолчанию 0)
+    - after_id: ID, после которого продолжить выборку (keyset-пагинация)
+    - offset: смещение (устаревший вариант, O(offset) на больших страницах)
     - level: фильтр по уровню важности
     - code: фильтр по коду уведомления
     """
     try:
         limit = int(request.GET.get('limit', 50))
-        offset = int(request.GET.get('offset', 0))
         level = request.GET.get('level')
         code = request.GET.get('code')
-        
+
         # Ограничиваем лимит
         limit = min(limit, 200)
-        
+
         # Базовый запрос
         queryset = Notification.objects.all()
-        
+
         # Фильтрация
         if level:
             queryset = queryset.filter(level=level)
         if code:
             queryset = queryset.filter(code=code)
-        
-        # Пагинация
+
+        # Keyset-пагинация по PK: глубина страницы не влияет на стоимость запроса
+        if 'after_id' in request.GET:
+            after_id = int(request.GET.get('after_id') or 0)
+            queryset = queryset.order_by('-id')
+            if after_id:
+                queryset = queryset.filter(id__lt=after_id)
+
+            notifications = list(queryset[:limit])
+            serializer = NotificationSerializer(notifications, many=True)
+
+            return Response({
+                'success': True,
+                'data': {
+                    'notifications': serializer.data,
+                    'limit': limit,
+                    'next_after_id': notifications[-1].id if notifications else None,
+                    'has_next': len(notifications) == limit
+                },
+                'error': None
+            }, status=status.HTTP_200_OK)
+
+        # Совместимость: offset-пагинация (медленная на глубоких страницах)
+        offset = int(request.GET.get('offset', 0))
+        if offset:
+            logger.warning("Deprecated offset pagination used: offset=%s", offset)
+
         total_count = queryset.count()
         notifications = queryset[offset:offset + limit]
-        
+
         # Сериализация
         serializer = NotificationSerializer(notifications, many=True)
-        
+
         return Response({
             'success': True,
             'data': {
@@ -208,7 +261,7 @@ def list_notifications(request):
         }, status=status.HTTP_400_BAD_REQUEST)
         
     except Exception as e:
-        logger.error(f"Notifications list failed: {str(e)}", exc_info=True)
+        logger.error("Notifications list failed: %s", e, exc_info=True)
         return Response({
             'success': False,
             'error': {
@@ -238,7 +291,7 @@ def create_notification(request):
         
         notification = serializer.save()
         
-        logger.info(f"Notification created: {notification.code} - {notification.text[:100]}")
+        logger.debug("Notification created: %s - %s", notification.code, notification.text[:100])
         
         return Response({
             'success': True,
@@ -247,7 +300,7 @@ def create_notification(request):
         }, status=status.HTTP_201_CREATED)
         
     except Exception as e:
-        logger.error(f"Notification creation failed: {str(e)}", exc_info=True)
+        logger.error("Notification creation failed: %s", e, exc_info=True)
         return Response({
             'success': False,
             'error': {
@@ -2,6 +2,7 @@
 Django admin для управления производственными данными
 """
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from .models import ProductionLine, LineAlias, Product, PlanTask, Downtime
 
@@ -22,11 +23,16 @@ class ProductionLineAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description', 'aliases__alias']
     ordering = ['name']
     inlines = [LineAliasInline]
-    
+
+    def get_queryset(self, request):
+        """Считаем псевдонимы одним запросом вместо COUNT на каждую строку"""
+        return super().get_queryset(request).annotate(_aliases_count=Count('aliases'))
+
     def aliases_count(self, obj):
         """Количество псевдонимов"""
-        return obj.aliases.count()
+        return obj._aliases_count
     aliases_count.short_description = 'Псевдонимы'
+    aliases_count.admin_order_field = '_aliases_count'
 
 
 @admin.register(Product)
@@ -52,7 +58,16 @@ class PlanTaskAdmin(admin.ModelAdmin):
     ordering = ['start_dt', 'production_line__name']
     date_hierarchy = 'start_dt'
     readonly_fields = ['created_at', 'updated_at']
-    
+
+    def get_queryset(self, request):
+        """Загружаем только колонки, нужные для списка, без N+1 по линии и продукту"""
+        return super().get_queryset(request).select_related(
+            'production_line', 'product'
+        ).only(
+            'id', 'title', 'start_dt', 'end_dt', 'source',
+            'production_line__name', 'product__name', 'product__code'
+        )
+
     fieldsets = (
         ('Основная информация', {
             'fields': ('title', 'production_line', 'product')
@@ -94,7 +109,14 @@ class DowntimeAdmin(admin.ModelAdmin):
     readonly_fields = [
         'created_at', 'updated_at', 'source_hash', 'extraction_version'
     ]
-    
+
+    def get_queryset(self, request):
+        """Не тянем объёмные JSON/текстовые поля (evidence_quote, notes, sources_json) в списке"""
+        return super().get_queryset(request).select_related('line').only(
+            'id', 'line__name', 'start_dt', 'end_dt', 'status',
+            'kind', 'confidence', 'source', 'created_at'
+        )
+
     fieldsets = (
         ('Основная информация', {
             'fields': ('line', 'start_dt', 'end_dt', 'status', 'kind')
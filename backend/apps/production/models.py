@@ -169,7 +169,11 @@ class PlanTask(models.Model):
         verbose_name_plural = 'Задачи плана'
         indexes = [
             models.Index(fields=['production_line', 'start_dt']),
+            # Покрывает поиск пересечений план × простой по линии
+            models.Index(fields=['production_line', 'start_dt', 'end_dt']),
             models.Index(fields=['start_dt', 'end_dt']),
+            # Фильтр end_date (end_dt__lte) не покрыт ведущими колонками выше
+            models.Index(fields=['end_dt']),
             models.Index(fields=['-created_at']),
             models.Index(fields=['source']),
         ]
@@ -300,7 +304,21 @@ class Downtime(models.Model):
         verbose_name="Источники JSON",
         help_text="Список источников при слиянии записей"
     )
-    
+    status_priority = models.GeneratedField(
+        expression=models.Case(
+            models.When(status='утверждено', then=models.Value(5)),
+            models.When(status='выполнено', then=models.Value(4)),
+            models.When(status='план', then=models.Value(3)),
+            models.When(status='предложение', then=models.Value(2)),
+            models.When(status='обсуждение', then=models.Value(1)),
+            default=models.Value(0),
+        ),
+        output_field=models.SmallIntegerField(),
+        db_persist=True,
+        verbose_name="Приоритет статуса",
+        help_text="Числовой приоритет статуса, вычисляется в БД"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
     
@@ -311,10 +329,22 @@ class Downtime(models.Model):
         indexes = [
             models.Index(fields=['line', 'start_dt', 'end_dt']),
             models.Index(fields=['start_dt', 'end_dt']),
+            # Фильтр end_date (end_dt__lte) не покрыт ведущими колонками выше
+            models.Index(fields=['end_dt']),
             models.Index(fields=['source']),
             models.Index(fields=['source_hash']),
             models.Index(fields=['-created_at']),
-            models.Index(fields=['confidence']),
+            # Совпадает с сортировкой списочного endpoint - Postgres читает
+            # индекс вместо filesort; ведущая колонка закрывает и фильтр
+            # по min_confidence
+            models.Index(fields=['-confidence', 'start_dt'], name='downtime_conf_start'),
+            models.Index(fields=['-status_priority']),
+            # Частичный индекс под утверждённые простои - основной фильтр конфликтов
+            models.Index(
+                fields=['line', 'start_dt'],
+                condition=models.Q(status='утверждено'),
+                name='downtime_approved_line_start'
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -328,18 +358,6 @@ class Downtime(models.Model):
         """Длительность простоя в днях"""
         return (self.end_dt - self.start_dt).days + 1
     
-    @property
-    def status_priority(self):
-        """Числовой приоритет статуса (для сравнения)"""
-        priorities = {
-            'утверждено': 5,
-            'выполнено': 4,
-            'план': 3,
-            'предложение': 2,
-            'обсуждение': 1,
-        }
-        return priorities.get(self.status, 0)
-    
     def __str__(self):
         line_name = self.line.name if self.line else 'Unknown'
         return f"{line_name} простой ({self.start_dt} - {self.end_dt})"
\ No newline at end of file
@@ -1,41 +1,125 @@
 """
 Сериализаторы для API производственных данных
 """
+import copy
+import operator
+from datetime import date, datetime
+
 from rest_framework import serializers
-from .models import ProductionLine, LineAlias, Product, PlanTask, Downtime
+from rest_framework.fields import empty
+from .models import ProductionLine, Product, PlanTask, Downtime
+
+
+class CachedFieldsSerializerMixin:
+    """
+    Кеширование построения полей сериализатора между запросами
+
+    DRF пересобирает словарь полей при каждом создании сериализатора,
+    что заметно на списочных ответах. Наборы полей здесь статичны,
+    поэтому собираем их один раз на класс и отдаём дешёвые shallow-копии;
+    bind() выставляет parent уже на копии, кеш остаётся несвязанным.
+
+    Попутно для полей с простым source (один атрибут модели, без '*',
+    точек и callable-цепочек) подменяем get_attribute на attrgetter:
+    generic-путь DRF (is_simple_callable + обход source_attrs) - один
+    из самых горячих участков сериализации списков.
+    """
+
+    _fields_cache = {}
+
+    def get_fields(self):
+        cache = CachedFieldsSerializerMixin._fields_cache
+        fields = cache.get(self.__class__)
+        if fields is None:
+            fields = super().get_fields()
+            for name, field in fields.items():
+                source = field.source or name
+                if source == '*' or '.' in source or field.write_only:
+                    continue
+                # Поля с default полагаются на fallback в generic-пути
+                # get_attribute при отсутствующем атрибуте
+                if field.default is not empty:
+                    continue
+                field.get_attribute = operator.attrgetter(source)
+            cache[self.__class__] = fields
+        return {name: copy.copy(field) for name, field in fields.items()}
+
+
+class FastDateField(serializers.DateField):
+    """
+    DateField с фиксированным форматом DD-MM-YYYY
+
+    Обе конвертации идут напрямую через strftime/strptime, минуя
+    общие ветки DRF (настраиваемые форматы, humanize) - на списочных
+    ответах это по два вызова на каждую строку.
+    """
+
+    def to_representation(self, value):
+        if value is None:
+            return None
+        return value.strftime('%d-%m-%Y')
+
+    def to_internal_value(self, value):
+        if isinstance(value, datetime):
+            self.fail('datetime')
+        if isinstance(value, date):
+            return value
+        try:
+            return datetime.strptime(value, '%d-%m-%Y').date()
+        except (TypeError, ValueError):
+            self.fail('invalid', format='DD-MM-YYYY')
 
 
-class ProductionLineSerializer(serializers.ModelSerializer):
+class ProductionLineSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """Сериализатор производственной линии"""
-    
-    aliases = serializers.SerializerMethodField()
-    
+
+    # Объявленное поле вместо SerializerMethodField: без reflection-пути
+    # bind() на каждый инстанс. Queryset обязан аннотировать aliases_list
+    # (ArrayAgg); default покрывает только что созданные линии без аннотации
+    aliases = serializers.ListField(
+        child=serializers.CharField(),
+        source='aliases_list',
+        read_only=True,
+        default=list,
+    )
+
     class Meta:
         model = ProductionLine
-        fields = [
-            'id', 'name', 'description', 'is_active', 
+        fields = (
+            'id', 'name', 'description', 'is_active',
             'aliases', 'created_at', 'updated_at'
-        ]
-        read_only_fields = ['created_at', 'updated_at']
-    
+        )
+        read_only_fields = ('created_at', 'updated_at')
+
+
+class NestedProductionLineSerializer(ProductionLineSerializer):
+    """
+    Вариант для вложенного использования (FK на линию)
+
+    Инстанс приходит из select_related без аннотации aliases_list,
+    поэтому псевдонимы читаются из prefetch-кеша связи.
+    """
+
+    aliases = serializers.SerializerMethodField()
+
     def get_aliases(self, obj):
         """Получить список псевдонимов линии"""
         return [alias.alias for alias in obj.aliases.all()]
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """Сериализатор продукта"""
     
     class Meta:
         model = Product
-        fields = ['id', 'name', 'code', 'description', 'created_at', 'updated_at']
-        read_only_fields = ['created_at', 'updated_at']
+        fields = ('id', 'name', 'code', 'description', 'created_at', 'updated_at')
+        read_only_fields = ('created_at', 'updated_at')
 
 
-class PlanTaskSerializer(serializers.ModelSerializer):
+class PlanTaskSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """Сериализатор задачи плана"""
-    
-    line = ProductionLineSerializer(source='production_line', read_only=True)
+
+    line = serializers.SerializerMethodField()
     product = ProductSerializer(read_only=True)
     
     # Для записи
@@ -43,66 +127,50 @@ class PlanTaskSerializer(serializers.ModelSerializer):
     product_id = serializers.IntegerField(write_only=True)
     
     # Форматирование даты в DD-MM-YYYY
-    start_dt = serializers.DateField(format='%d-%m-%Y', input_formats=['%d-%m-%Y'])
-    end_dt = serializers.DateField(format='%d-%m-%Y', input_formats=['%d-%m-%Y'])
+    start_dt = FastDateField()
+    end_dt = FastDateField()
     
     class Meta:
         model = PlanTask
-        fields = [
-            'id', 'line', 'product', 'title', 
+        fields = (
+            'id', 'line', 'product', 'title',
             'start_dt', 'end_dt', 'source',
             'line_id', 'product_id',
             'created_at', 'updated_at'
-        ]
-        read_only_fields = ['created_at', 'updated_at']
-    
-    def validate(self, data):
-        """Валидация данных задачи"""
-        if data.get('start_dt') and data.get('end_dt'):
-            if data['start_dt'] > data['end_dt']:
-                raise serializers.ValidationError(
-                    "Дата начала не может быть позже даты окончания"
-                )
-        return data
+        )
+        read_only_fields = ('created_at', 'updated_at')
 
+    def get_line(self, obj):
+        """Плоское представление линии без полного вложенного сериализатора"""
+        line = obj.production_line
+        return {
+            'id': obj.production_line_id,
+            'name': line.name,
+            'aliases': [alias.alias for alias in line.aliases.all()],
+        }
 
-class DowntimeSerializer(serializers.ModelSerializer):
+
+class DowntimeSerializer(CachedFieldsSerializerMixin, serializers.ModelSerializer):
     """Сериализатор простоя"""
     
-    line = ProductionLineSerializer(read_only=True)
+    line = NestedProductionLineSerializer(read_only=True)
     line_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
-    
+
     # Форматирование даты в DD-MM-YYYY
-    start_dt = serializers.DateField(format='%d-%m-%Y', input_formats=['%d-%m-%Y'])
-    end_dt = serializers.DateField(format='%d-%m-%Y', input_formats=['%d-%m-%Y'])
-    
+    start_dt = FastDateField()
+    end_dt = FastDateField()
+
     class Meta:
         model = Downtime
-        fields = [
+        fields = (
             'id', 'line', 'line_id', 'start_dt', 'end_dt',
             'status', 'kind', 'source_file', 'evidence_quote',
             'evidence_location', 'confidence', 'partial_date_start',
             'partial_date_end', 'notes', 'extraction_version',
             'source_hash', 'source', 'sources_json',
             'created_at', 'updated_at'
-        ]
-        read_only_fields = ['created_at', 'updated_at']
-    
-    def validate(self, data):
-        """Валидация данных простоя"""
-        if data.get('start_dt') and data.get('end_dt'):
-            if data['start_dt'] > data['end_dt']:
-                raise serializers.ValidationError(
-                    "Дата начала не может быть позже даты окончания"
-                )
-        
-        if data.get('confidence') is not None:
-            if not (0.0 <= data['confidence'] <= 1.0):
-                raise serializers.ValidationError(
-                    "Уверенность должна быть в диапазоне от 0.0 до 1.0"
-                )
-        
-        return data
+        )
+        read_only_fields = ('created_at', 'updated_at')
 
 
 class PlanUploadSerializer(serializers.Serializer):
@@ -125,5 +193,14 @@ class PlanUploadSerializer(serializers.Serializer):
                 f"Размер файла не должен превышать 20 МБ. "
                 f"Текущий размер: {value.size / 1024 / 1024:.1f} МБ"
             )
-        
+
+        # .xlsx - это ZIP-архив; проверяем сигнатуру до запуска дорогого парсера
+        if value.name.lower().endswith('.xlsx'):
+            magic = value.read(4)
+            value.seek(0)
+            if magic != b'PK\x03\x04':
+                raise serializers.ValidationError(
+                    "Файл не является корректным .xlsx (неверная сигнатура)"
+                )
+
         return value
@@ -6,16 +6,22 @@ from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import CharField, Prefetch, Q, Value
 from django.utils import timezone
-from django.http import HttpResponse
-from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.apps import apps as django_apps
+from django.db import connection, transaction
 import logging
 import csv
-import json
+import orjson
+from functools import lru_cache
 from datetime import datetime
-from io import StringIO
 
-from .models import ProductionLine, PlanTask, Downtime
+from apps.core.mixins import SerializerOnlyFieldsMixin
+from apps.core.utils import format_ddmmyyyy, parse_ddmmyyyy
+from .models import ProductionLine, LineAlias, PlanTask, Downtime
 from .serializers import (
     ProductionLineSerializer, 
     PlanTaskSerializer, 
@@ -26,10 +32,58 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
-class ProductionLineListView(generics.ListCreateAPIView):
+class _Echo:
+    """Псевдо-буфер для csv.writer: отдаёт строку сразу в поток ответа"""
+
+    def write(self, value):
+        return value
+
+
+def _apply_date_range(queryset, params):
+    """
+    Фильтрация queryset по start_date/end_date (DD-MM-YYYY) из query params
+
+    Некорректные значения игнорируются - поведение всех четырёх
+    endpoints с датными фильтрами одинаковое.
+    """
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+
+    if start_date:
+        try:
+            queryset = queryset.filter(start_dt__gte=parse_ddmmyyyy(start_date))
+        except ValueError:
+            pass
+
+    if end_date:
+        try:
+            queryset = queryset.filter(end_dt__lte=parse_ddmmyyyy(end_date))
+        except ValueError:
+            pass
+
+    return queryset
+
+
+def _aliases_prefetch(lookup):
+    """Префетч псевдонимов только нужными колонками (FK обязателен,
+    иначе Django перечитает строки)"""
+    return Prefetch(
+        lookup,
+        queryset=LineAlias.objects.only('alias', 'production_line_id')
+    )
+
+
+class ProductionLineListView(SerializerOnlyFieldsMixin, generics.ListCreateAPIView):
     """Список производственных линий"""
     
-    queryset = ProductionLine.objects.prefetch_related('aliases').filter(is_active=True)
+    # Псевдонимы приезжают готовым массивом из одного SQL-агрегата -
+    # без второго запроса префетча и без сборки списков в Python
+    queryset = ProductionLine.objects.filter(is_active=True).annotate(
+        aliases_list=ArrayAgg(
+            'aliases__alias', distinct=True, filter=Q(aliases__isnull=False),
+            default=Value([], output_field=ArrayField(CharField()))
+        )
+    )
     serializer_class = ProductionLineSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'aliases__alias']
@@ -38,58 +92,54 @@ class ProductionLineListView(generics.ListCreateAPIView):
 
 class ProductionLineDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Детали производственной линии"""
-    
-    queryset = ProductionLine.objects.prefetch_related('aliases')
+
+    # Сериализатор читает псевдонимы из аннотации aliases_list
+    queryset = ProductionLine.objects.annotate(
+        aliases_list=ArrayAgg(
+            'aliases__alias', distinct=True, filter=Q(aliases__isnull=False),
+            default=Value([], output_field=ArrayField(CharField()))
+        )
+    )
     serializer_class = ProductionLineSerializer
 
 
-class PlanTaskListView(generics.ListCreateAPIView):
+class PlanTaskListView(SerializerOnlyFieldsMixin, generics.ListCreateAPIView):
     """Список задач плана производства"""
-    
-    queryset = PlanTask.objects.select_related('production_line', 'product')
+
+    queryset = PlanTask.objects.select_related(
+        'production_line', 'product'
+    ).prefetch_related(_aliases_prefetch('production_line__aliases'))
     serializer_class = PlanTaskSerializer
+    # get_line() читает только имя линии - поле не выводится из сериализатора;
+    # псевдонимы приходят отдельным prefetch-запросом
+    only_extra_fields = ('production_line__name',)
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['production_line', 'source']
     ordering = ['start_dt', 'production_line__name']
     
     def get_queryset(self):
         """Фильтрация по датам"""
-        queryset = super().get_queryset()
-        
-        # Фильтрация по диапазону дат
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        
-        if start_date:
-            try:
-                from datetime import datetime
-                start_dt = datetime.strptime(start_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(start_dt__gte=start_dt)
-            except ValueError:
-                pass
-        
-        if end_date:
-            try:
-                from datetime import datetime
-                end_dt = datetime.strptime(end_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(end_dt__lte=end_dt)
-            except ValueError:
-                pass
-        
-        return queryset
+        return _apply_date_range(super().get_queryset(), self.request.query_params)
 
 
-class PlanTaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PlanTaskDetailView(SerializerOnlyFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
     """Детали задачи плана"""
-    
-    queryset = PlanTask.objects.select_related('production_line', 'product')
+
+    queryset = PlanTask.objects.select_related(
+        'production_line', 'product'
+    ).prefetch_related(_aliases_prefetch('production_line__aliases'))
     serializer_class = PlanTaskSerializer
+    only_extra_fields = ('production_line__name',)
 
 
-class DowntimeListView(generics.ListCreateAPIView):
+class DowntimeListView(SerializerOnlyFieldsMixin, generics.ListCreateAPIView):
     """Список простоев производственных линий"""
-    
-    queryset = Downtime.objects.select_related('line')
+
+    # Псевдонимы линии читаются вложенным сериализатором из prefetch-кеша -
+    # без префетча это один запрос на каждую строку страницы
+    queryset = Downtime.objects.select_related(
+        'line'
+    ).prefetch_related(_aliases_prefetch('line__aliases'))
     serializer_class = DowntimeSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['line', 'status', 'kind', 'source']
@@ -97,28 +147,8 @@ class DowntimeListView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         """Фильтрация по датам и уверенности"""
-        queryset = super().get_queryset()
-        
-        # Фильтрация по диапазону дат
-        start_date = self.request.query_params.get('start_date')
-        end_date = self.request.query_params.get('end_date')
-        
-        if start_date:
-            try:
-                from datetime import datetime
-                start_dt = datetime.strptime(start_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(start_dt__gte=start_dt)
-            except ValueError:
-                pass
-        
-        if end_date:
-            try:
-                from datetime import datetime
-                end_dt = datetime.strptime(end_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(end_dt__lte=end_dt)
-            except ValueError:
-                pass
-        
+        queryset = _apply_date_range(super().get_queryset(), self.request.query_params)
+
         # Фильтрация по минимальной уверенности
         min_confidence = self.request.query_params.get('min_confidence')
         if min_confidence:
@@ -133,8 +163,10 @@ class DowntimeListView(generics.ListCreateAPIView):
 
 class DowntimeDetailView(generics.RetrieveUpdateDestroyAPIView):
     """Детали простоя"""
-    
-    queryset = Downtime.objects.select_related('line')
+
+    queryset = Downtime.objects.select_related(
+        'line'
+    ).prefetch_related(_aliases_prefetch('line__aliases'))
     serializer_class = DowntimeSerializer
 
 
@@ -150,11 +182,34 @@ def upload_plan(request):
     - Начало выполнения (DD.MM.YYYY)
     - Завершение выполнения (DD.MM.YYYY)
     """
+    max_size = 20 * 1024 * 1024  # 20 МБ
+
+    # Ранний отказ по заголовку Content-Length: обращение к request.data/FILES
+    # запускает разбор multipart-тела, то есть заведомо слишком большой запрос
+    # будет сначала целиком прочитан. Небольшой запас - накладные расходы
+    # multipart (границы, заголовки частей).
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (TypeError, ValueError):
+        content_length = 0
+    if content_length > max_size + 64 * 1024:
+        return Response({
+            'success': False,
+            'data': None,
+            'error': {
+                'code': 'PAYLOAD_TOO_LARGE',
+                'message': f'Размер запроса ({content_length / 1024 / 1024:.1f} МБ) превышает максимально допустимый (20 МБ)',
+                'details': {
+                    'content_length_mb': round(content_length / 1024 / 1024, 1),
+                    'max_size_mb': 20
+                }
+            }
+        }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
     try:
         # Проверка размера файла (20 МБ максимум)
         if hasattr(request, 'FILES') and 'file' in request.FILES:
             uploaded_file = request.FILES['file']
-            max_size = 20 * 1024 * 1024  # 20 МБ
             if uploaded_file.size > max_size:
                 return Response({
                     'success': False,
@@ -189,18 +244,14 @@ def upload_plan(request):
         
         # Интеграция с обработчиком Excel файлов
         from apps.documents.services import FileProcessingManager
-        import asyncio
-        
+        from asgiref.sync import async_to_sync
+
         processor = FileProcessingManager()
-        
-        # Запускаем асинхронную обработку
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            processing_result = loop.run_until_complete(processor.process_file(uploaded_file))
-        finally:
-            loop.close()
+
+        # async_to_sync переиспользует инфраструктуру asgiref вместо
+        # создания/закрытия отдельного event loop на каждый запрос
+        # и корректно работает под ASGI-сервером
+        processing_result = async_to_sync(processor.process_file)(uploaded_file)
         
         if not processing_result.success:
             error_message = (
@@ -262,42 +313,73 @@ def get_conflicts(request):
     Получение списка конфликтов между задачами плана и простоями
     """
     try:
-        # Получаем все задачи и простои
-        tasks = PlanTask.objects.select_related('production_line', 'product').all()
-        downtimes = Downtime.objects.select_related('line').all()
-        
+        # Пересечения считает БД одним соединением по диапазонам дат -
+        # вместо декартова произведения задач и простоев в Python.
+        # Соединение по line_id покрыто составными индексами обеих таблиц.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT p.id,
+                       d.id,
+                       GREATEST(p.start_dt, d.start_dt),
+                       LEAST(p.end_dt, d.end_dt)
+                FROM plan_tasks p
+                JOIN downtimes d
+                  ON d.line_id = p.production_line_id
+                 AND p.start_dt <= d.end_dt
+                 AND p.end_dt >= d.start_dt
+                ORDER BY p.id, d.id
+                """
+            )
+            pairs = cursor.fetchall()
+
+        # Загружаем только участвующие объекты; prefetch псевдонимов
+        # закрывает N+1 вложенных сериализаторов
+        task_ids = {pair[0] for pair in pairs}
+        downtime_ids = {pair[1] for pair in pairs}
+        tasks_by_id = PlanTask.objects.filter(id__in=task_ids).select_related(
+            'production_line', 'product'
+        ).prefetch_related(_aliases_prefetch('production_line__aliases')).in_bulk()
+        downtimes_by_id = Downtime.objects.filter(id__in=downtime_ids).select_related(
+            'line'
+        ).prefetch_related(_aliases_prefetch('line__aliases')).in_bulk()
+
+        # Сериализуем каждый объект один раз (many=True), а не на каждую
+        # пару: задача или простой могут участвовать в десятках конфликтов
+        task_data = dict(zip(
+            tasks_by_id,
+            PlanTaskSerializer(list(tasks_by_id.values()), many=True).data
+        ))
+        downtime_data = dict(zip(
+            downtimes_by_id,
+            DowntimeSerializer(list(downtimes_by_id.values()), many=True).data
+        ))
+
+        # Одна метка времени на ответ, а не на каждый конфликт
+        now_iso = timezone.now().isoformat()
+
         conflicts = []
-        
-        # Поиск пересечений
-        for task in tasks:
-            for downtime in downtimes:
-                # Проверяем только если линии совпадают
-                if downtime.line_id == task.production_line_id:
-                    # Проверяем пересечение дат (включительно)
-                    if (task.start_dt <= downtime.end_dt and 
-                        task.end_dt >= downtime.start_dt):
-                        
-                        # Вычисляем пересечение
-                        overlap_start = max(task.start_dt, downtime.start_dt)
-                        overlap_end = min(task.end_dt, downtime.end_dt)
-                        
-                        conflict = {
-                            'id': f"conflict_{task.id}_{downtime.id}",
-                            'level': 'warning',
-                            'code': 'CONFLICT_DETECTED',
-                            'text': (
-                                f"Конфликт расписания: задача '{task.title}' "
-                                f"пересекается с простоем {downtime.line.name if downtime.line else 'Unknown'} "
-                                f"с {downtime.start_dt.strftime('%d-%m-%Y')} по {downtime.end_dt.strftime('%d-%m-%Y')}"
-                            ),
-                            'plan_task': PlanTaskSerializer(task).data,
-                            'downtime': DowntimeSerializer(downtime).data,
-                            'overlap_start': overlap_start.strftime('%d-%m-%Y'),
-                            'overlap_end': overlap_end.strftime('%d-%m-%Y'),
-                            'priority_status': downtime.status or 'unknown',
-                            'created_at': timezone.now().isoformat()
-                        }
-                        conflicts.append(conflict)
+        for task_id, downtime_id, overlap_start, overlap_end in pairs:
+            task = tasks_by_id[task_id]
+            downtime = downtimes_by_id[downtime_id]
+
+            conflict = {
+                'id': f"conflict_{task.id}_{downtime.id}",
+                'level': 'warning',
+                'code': 'CONFLICT_DETECTED',
+                'text': (
+                    f"Конфликт расписания: задача '{task.title}' "
+                    f"пересекается с простоем {downtime.line.name if downtime.line else 'Unknown'} "
+                    f"с {format_ddmmyyyy(downtime.start_dt)} по {format_ddmmyyyy(downtime.end_dt)}"
+                ),
+                'plan_task': task_data[task_id],
+                'downtime': downtime_data[downtime_id],
+                'overlap_start': format_ddmmyyyy(overlap_start),
+                'overlap_end': format_ddmmyyyy(overlap_end),
+                'priority_status': downtime.status or 'unknown',
+                'created_at': now_iso
+            }
+            conflicts.append(conflict)
         
         logger.info(f"Conflicts check completed: {len(conflicts)} conflicts found")
         
@@ -321,51 +403,88 @@ def get_conflicts(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def _get_conflicts_data():
+def _iter_conflicts_data():
     """
-    Получение данных о конфликтах для экспорта
+    Генератор данных о конфликтах для экспорта
+
+    Отдаёт словари по одному: CSV-экспорт стримит их в ответ, не
+    собирая весь список конфликтов в памяти. Серверный (named) курсор
+    держит результат на стороне Postgres и отдаёт пары чанками,
+    справочные данные подгружаются на каждый чанк - память ограничена
+    размером чанка, а не числом конфликтов. При
+    DISABLE_SERVER_SIDE_CURSORS (pgbouncer) Django вернёт обычный
+    курсор, и чанкованной останется только сборка строк.
     """
-    # Получаем все задачи и простои
-    tasks = PlanTask.objects.select_related('production_line', 'product').all()
-    downtimes = Downtime.objects.select_related('line').all()
-    
-    conflicts = []
-    
-    # Поиск пересечений
-    for task in tasks:
-        for downtime in downtimes:
-            # Проверяем только если линии совпадают
-            if downtime.line_id == task.production_line_id:
-                # Проверяем пересечение дат (включительно)
-                if (task.start_dt <= downtime.end_dt and 
-                    task.end_dt >= downtime.start_dt):
-                    
-                    # Вычисляем пересечение
-                    overlap_start = max(task.start_dt, downtime.start_dt)
-                    overlap_end = min(task.end_dt, downtime.end_dt)
-                    
-                    conflict = {
-                        'id': f"conflict_{task.id}_{downtime.id}",
-                        'линия': downtime.line.name if downtime.line else 'Неизвестная линия',
-                        'задача_плана': task.title,
-                        'продукт': task.product.name if task.product else '',
-                        'план_начало': task.start_dt.strftime('%d-%m-%Y'),
-                        'план_окончание': task.end_dt.strftime('%d-%m-%Y'),
-                        'простой_начало': downtime.start_dt.strftime('%d-%m-%Y'),
-                        'простой_окончание': downtime.end_dt.strftime('%d-%m-%Y'),
-                        'пересечение_начало': overlap_start.strftime('%d-%m-%Y'),
-                        'пересечение_окончание': overlap_end.strftime('%d-%m-%Y'),
-                        'тип_простоя': downtime.kind or '',
-                        'статус': downtime.status or '',
-                        'источник': downtime.source or '',
-                        'уверенность': f"{downtime.confidence:.2f}" if downtime.confidence is not None else '',
-                        'цитата': downtime.evidence_quote or '',
-                        'файл_источника': downtime.source_file or '',
-                        'создано': timezone.now().strftime('%d-%m-%Y %H:%M:%S')
-                    }
-                    conflicts.append(conflict)
-    
-    return conflicts
+    # Одна метка времени на экспорт, а не на каждую строку
+    now_str = timezone.now().strftime('%d-%m-%Y %H:%M:%S')
+
+    # Как и в get_conflicts, пересечения считает БД одним соединением
+    # по линии и диапазонам дат - без декартова произведения в Python
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT p.id,
+                   d.id,
+                   GREATEST(p.start_dt, d.start_dt),
+                   LEAST(p.end_dt, d.end_dt)
+            FROM plan_tasks p
+            JOIN downtimes d
+              ON d.line_id = p.production_line_id
+             AND p.start_dt <= d.end_dt
+             AND p.end_dt >= d.start_dt
+            ORDER BY p.id, d.id
+            """
+        )
+        while True:
+            pairs = cursor.fetchmany(5000)
+            if not pairs:
+                break
+            yield from _build_conflict_rows(pairs, now_str)
+
+
+def _build_conflict_rows(pairs, now_str):
+    """Сборка словарей конфликтов для чанка пар (task_id, downtime_id, даты)"""
+    # Плоские словари вместо модельных инстансов: экспорт читает
+    # фиксированный набор колонок, дескрипторы и hydration не нужны
+    tasks_by_id = {
+        row['id']: row
+        for row in PlanTask.objects.filter(
+            id__in={pair[0] for pair in pairs}
+        ).values('id', 'title', 'start_dt', 'end_dt', 'product__name')
+    }
+    downtimes_by_id = {
+        row['id']: row
+        for row in Downtime.objects.filter(
+            id__in={pair[1] for pair in pairs}
+        ).values(
+            'id', 'line__name', 'start_dt', 'end_dt', 'kind', 'status',
+            'source', 'confidence', 'evidence_quote', 'source_file'
+        )
+    }
+
+    for task_id, downtime_id, overlap_start, overlap_end in pairs:
+        task = tasks_by_id[task_id]
+        downtime = downtimes_by_id[downtime_id]
+
+        yield {
+            'id': f"conflict_{task_id}_{downtime_id}",
+            'линия': downtime['line__name'] or 'Неизвестная линия',
+            'задача_плана': task['title'],
+            'продукт': task['product__name'] or '',
+            'план_начало': format_ddmmyyyy(task['start_dt']),
+            'план_окончание': format_ddmmyyyy(task['end_dt']),
+            'простой_начало': format_ddmmyyyy(downtime['start_dt']),
+            'простой_окончание': format_ddmmyyyy(downtime['end_dt']),
+            'пересечение_начало': format_ddmmyyyy(overlap_start),
+            'пересечение_окончание': format_ddmmyyyy(overlap_end),
+            'тип_простоя': downtime['kind'] or '',
+            'статус': downtime['status'] or '',
+            'источник': downtime['source'] or '',
+            'уверенность': f"{downtime['confidence']:.2f}" if downtime['confidence'] is not None else '',
+            'цитата': downtime['evidence_quote'] or '',
+            'файл_источника': downtime['source_file'] or '',
+            'создано': now_str
+        }
 
 
 @api_view(['GET'])
@@ -374,36 +493,29 @@ def export_conflicts_csv(request):
     Экспорт конфликтов в CSV формате
     """
     try:
-        conflicts = _get_conflicts_data()
-        
-        # Создаем CSV
-        output = StringIO()
-        
-        if conflicts:
-            fieldnames = list(conflicts[0].keys())
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(conflicts)
-        else:
-            # Пустой CSV с заголовками
-            fieldnames = [
-                'id', 'линия', 'задача_плана', 'продукт', 'план_начало', 'план_окончание',
-                'простой_начало', 'простой_окончание', 'пересечение_начало', 'пересечение_окончание',
-                'тип_простоя', 'статус', 'источник', 'уверенность', 'цитата', 'файл_источника', 'создано'
-            ]
-            writer = csv.DictWriter(output, fieldnames=fieldnames)
-            writer.writeheader()
-        
-        response = HttpResponse(
-            output.getvalue(),
+        fieldnames = [
+            'id', 'линия', 'задача_плана', 'продукт', 'план_начало', 'план_окончание',
+            'простой_начало', 'простой_окончание', 'пересечение_начало', 'пересечение_окончание',
+            'тип_простоя', 'статус', 'источник', 'уверенность', 'цитата', 'файл_источника', 'создано'
+        ]
+        writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+
+        def csv_rows():
+            yield writer.writeheader()
+            for conflict in _iter_conflicts_data():
+                yield writer.writerow(conflict)
+
+        # Стримим строки вместо буферизации всего CSV в памяти
+        response = StreamingHttpResponse(
+            csv_rows(),
             content_type='text/csv; charset=utf-8'
         )
-        
+
         filename = f"конфликты_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        logger.info(f"Conflicts exported to CSV: {len(conflicts)} conflicts")
-        
+
+        logger.info("Conflicts CSV export started")
+
         return response
         
     except Exception as e:
@@ -421,8 +533,8 @@ def export_conflicts_json(request):
     Экспорт конфликтов в JSON формате
     """
     try:
-        conflicts = _get_conflicts_data()
-        
+        conflicts = list(_iter_conflicts_data())
+
         export_data = {
             'экспортировано': timezone.now().strftime('%d-%m-%Y %H:%M:%S'),
             'всего_конфликтов': len(conflicts),
@@ -430,7 +542,7 @@ def export_conflicts_json(request):
         }
         
         response = HttpResponse(
-            json.dumps(export_data, ensure_ascii=False, indent=2),
+            orjson.dumps(export_data, option=orjson.OPT_INDENT_2),
             content_type='application/json; charset=utf-8'
         )
         
@@ -444,9 +556,9 @@ def export_conflicts_json(request):
     except Exception as e:
         logger.error(f"JSON export failed: {str(e)}", exc_info=True)
         return HttpResponse(
-            json.dumps({
+            orjson.dumps({
                 'ошибка': f"Не удалось экспортировать данные: {str(e)}"
-            }, ensure_ascii=False),
+            }),
             status=500,
             content_type='application/json; charset=utf-8'
         )
@@ -459,124 +571,116 @@ def export_plan_excel(request):
     """
     try:
         import openpyxl
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
         from openpyxl.utils import get_column_letter
         from io import BytesIO
-        
+
         # Получаем данные плана
         queryset = PlanTask.objects.select_related('production_line', 'product')
         
         # Применяем фильтры из query params
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
+        queryset = _apply_date_range(queryset, request.query_params)
         line_id = request.query_params.get('line_id')
-        
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(start_dt__gte=start_dt)
-            except ValueError:
-                pass
-        
-        if end_date:
-            try:
-                end_dt = datetime.strptime(end_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(end_dt__lte=end_dt)
-            except ValueError:
-                pass
-        
+
         if line_id:
             try:
                 queryset = queryset.filter(production_line_id=int(line_id))
             except ValueError:
                 pass
         
-        plan_tasks = queryset.order_by('start_dt', 'production_line__name')
-        
-        # Создаем Excel файл
-        workbook = openpyxl.Workbook()
-        worksheet = workbook.active
-        worksheet.title = "План производства"
-        
+        # Плоские словари вместо модельных инстансов: экспорту не нужны
+        # ни валидация, ни ленивые атрибуты - только значения колонок
+        plan_tasks = queryset.order_by('start_dt', 'production_line__name').values(
+            'id', 'production_line__name', 'product__name', 'product__code',
+            'title', 'start_dt', 'end_dt', 'source', 'created_at'
+        )
+        source_labels = dict(PlanTask._meta.get_field('source').flatchoices)
+
+        # Книга в write-only режиме: строки сбрасываются на диск по мере записи,
+        # память не растёт с количеством задач
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet("План производства")
+
         # Стили
         header_font = Font(bold=True, color="FFFFFF")
         header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
         header_alignment = Alignment(horizontal="center", vertical="center")
+        center_alignment = Alignment(horizontal="center")
         border = Border(
             left=Side(style="thin"),
             right=Side(style="thin"),
             top=Side(style="thin"),
             bottom=Side(style="thin")
         )
-        
+
         # Заголовки
         headers = [
             'ID', 'Производственная линия', 'Продукт', 'Код продукта',
             'Задача', 'Дата начала', 'Дата окончания', 'Длительность (дни)',
             'Источник', 'Дата создания'
         ]
-        
+
+        # Ширины колонок фиксируем заранее: автоподбор после записи
+        # в write-only режиме невозможен
+        column_widths = [8, 25, 25, 20, 40, 14, 16, 18, 14, 22]
+        for col_idx, width in enumerate(column_widths, 1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+
         # Записываем заголовки
-        for col_idx, header in enumerate(headers, 1):
-            cell = worksheet.cell(row=1, column=col_idx)
-            cell.value = header
+        header_row = []
+        for header in headers:
+            cell = WriteOnlyCell(worksheet, value=header)
             cell.font = header_font
             cell.fill = header_fill
             cell.alignment = header_alignment
             cell.border = border
-        
-        # Записываем данные
-        for row_idx, task in enumerate(plan_tasks, 2):
+            header_row.append(cell)
+        worksheet.append(header_row)
+
+        # Колонки с центрированием: ID, даты, длительность, дата создания
+        centered_columns = {1, 6, 7, 8, 10}
+
+        # Записываем данные потоково
+        for task in plan_tasks.iterator(chunk_size=2000):
             data = [
-                task.id,
-                task.production_line.name if task.production_line else '',
-                task.product.name if task.product else '',
-                task.product.code if task.product else '',
-                task.title,
-                task.start_dt.strftime('%d-%m-%Y'),
-                task.end_dt.strftime('%d-%m-%Y'),
-                task.duration_days,
-                task.get_source_display(),
-                task.created_at.strftime('%d-%m-%Y %H:%M:%S')
+                task['id'],
+                task['production_line__name'] or '',
+                task['product__name'] or '',
+                task['product__code'] or '',
+                task['title'],
+                format_ddmmyyyy(task['start_dt']),
+                format_ddmmyyyy(task['end_dt']),
+                (task['end_dt'] - task['start_dt']).days + 1,
+                source_labels.get(task['source'], task['source']),
+                task['created_at'].strftime('%d-%m-%Y %H:%M:%S')
             ]
-            
+
+            row = []
             for col_idx, value in enumerate(data, 1):
-                cell = worksheet.cell(row=row_idx, column=col_idx)
-                cell.value = value
+                cell = WriteOnlyCell(worksheet, value=value)
                 cell.border = border
-                
-                # Выравнивание для дат и чисел
-                if col_idx in [1, 6, 7, 8, 10]:  # ID, даты, длительность, дата создания
-                    cell.alignment = Alignment(horizontal="center")
-        
-        # Автоподбор ширины колонок
-        for col_idx in range(1, len(headers) + 1):
-            column_letter = get_column_letter(col_idx)
-            max_length = 0
-            
-            for row in worksheet[column_letter]:
-                if row.value:
-                    max_length = max(max_length, len(str(row.value)))
-            
-            # Устанавливаем ширину с небольшим запасом
-            worksheet.column_dimensions[column_letter].width = min(max_length + 2, 50)
-        
+                if col_idx in centered_columns:
+                    cell.alignment = center_alignment
+                row.append(cell)
+            worksheet.append(row)
+
         # Сохраняем в память
         buffer = BytesIO()
         workbook.save(buffer)
         buffer.seek(0)
-        
+
         # Создаем HTTP ответ
         response = HttpResponse(
             buffer.getvalue(),
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
-        
+
         filename = f"план_производства_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        logger.info(f"Plan exported to Excel: {len(plan_tasks)} tasks")
-        
+
+        logger.info("Plan exported to Excel")
+
         return response
         
     except ImportError:
@@ -606,68 +710,57 @@ def export_plan_csv(request):
         queryset = PlanTask.objects.select_related('production_line', 'product')
         
         # Применяем фильтры из query params
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
+        queryset = _apply_date_range(queryset, request.query_params)
         line_id = request.query_params.get('line_id')
-        
-        if start_date:
-            try:
-                start_dt = datetime.strptime(start_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(start_dt__gte=start_dt)
-            except ValueError:
-                pass
-        
-        if end_date:
-            try:
-                end_dt = datetime.strptime(end_date, '%d-%m-%Y').date()
-                queryset = queryset.filter(end_dt__lte=end_dt)
-            except ValueError:
-                pass
-        
+
         if line_id:
             try:
                 queryset = queryset.filter(production_line_id=int(line_id))
             except ValueError:
                 pass
         
-        plan_tasks = queryset.order_by('start_dt', 'production_line__name')
-        
-        # Создаем CSV
-        output = StringIO()
-        
+        # Плоские словари вместо модельных инстансов - писателю CSV
+        # нужны только значения колонок
+        plan_tasks = queryset.order_by('start_dt', 'production_line__name').values(
+            'id', 'production_line__name', 'product__name', 'product__code',
+            'title', 'start_dt', 'end_dt', 'source', 'created_at'
+        )
+        source_labels = dict(PlanTask._meta.get_field('source').flatchoices)
+
         fieldnames = [
             'ID', 'производственная_линия', 'продукт', 'код_продукта',
             'задача', 'дата_начала', 'дата_окончания', 'длительность_дни',
             'источник', 'дата_создания'
         ]
-        
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for task in plan_tasks:
-            writer.writerow({
-                'ID': task.id,
-                'производственная_линия': task.production_line.name if task.production_line else '',
-                'продукт': task.product.name if task.product else '',
-                'код_продукта': task.product.code if task.product else '',
-                'задача': task.title,
-                'дата_начала': task.start_dt.strftime('%d-%m-%Y'),
-                'дата_окончания': task.end_dt.strftime('%d-%m-%Y'),
-                'длительность_дни': task.duration_days,
-                'источник': task.get_source_display(),
-                'дата_создания': task.created_at.strftime('%d-%m-%Y %H:%M:%S')
-            })
-        
-        response = HttpResponse(
-            output.getvalue(),
+        writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+
+        def csv_rows():
+            yield writer.writeheader()
+            # iterator() не кеширует queryset - память ограничена размером чанка
+            for task in plan_tasks.iterator(chunk_size=2000):
+                yield writer.writerow({
+                    'ID': task['id'],
+                    'производственная_линия': task['production_line__name'] or '',
+                    'продукт': task['product__name'] or '',
+                    'код_продукта': task['product__code'] or '',
+                    'задача': task['title'],
+                    'дата_начала': format_ddmmyyyy(task['start_dt']),
+                    'дата_окончания': format_ddmmyyyy(task['end_dt']),
+                    'длительность_дни': (task['end_dt'] - task['start_dt']).days + 1,
+                    'источник': source_labels.get(task['source'], task['source']),
+                    'дата_создания': task['created_at'].strftime('%d-%m-%Y %H:%M:%S')
+                })
+
+        response = StreamingHttpResponse(
+            csv_rows(),
             content_type='text/csv; charset=utf-8'
         )
-        
+
         filename = f"план_производства_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        logger.info(f"Plan exported to CSV: {len(plan_tasks)} tasks")
-        
+
+        logger.info("Plan CSV export started")
+
         return response
         
     except Exception as e:
@@ -678,11 +771,31 @@ def export_plan_csv(request):
             content_type='text/plain; charset=utf-8'
         )
     
+@lru_cache(maxsize=1)
+def _project_tables():
+    """Имена таблиц прикладных приложений - состав фиксирован на жизнь процесса"""
+    return tuple(
+        model._meta.db_table
+        for app_config in django_apps.get_app_configs()
+        if app_config.name.startswith('apps.')
+        for model in app_config.get_models()
+    )
+
+
 @api_view(["POST"])
 def reset_database(request):
     try:
-        # flush сбрасывает все таблицы и автоинкременты
-        call_command("flush", "--noinput")
+        # Один TRUNCATE всех прикладных таблиц вместо manage.py flush:
+        # без накладных расходов команды и post-migrate сигналов,
+        # сброс автоинкрементов и каскад делает сама БД
+        tables = _project_tables()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'TRUNCATE TABLE {} RESTART IDENTITY CASCADE'.format(
+                        ', '.join(connection.ops.quote_name(table) for table in tables)
+                    )
+                )
         return Response({"status": "ok", "message": "Database has been cleared."})
     except Exception as e:
         return Response({"status": "error", "message": str(e)}, status=500)
\ No newline at end of file
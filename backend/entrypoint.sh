@@ -6,5 +6,9 @@ python manage.py makemigrations --noinput
 
 python manage.py migrate --noinput
 
-# Для MVP оставим runserver (в проде используйте gunicorn+daphne/uvicorn при необходимости ASGI)
-exec python manage.py runserver 0.0.0.0:8000
+# ASGI через gunicorn+uvicorn: SSE-поток уведомлений держит соединения
+# в event loop, не занимая по потоку воркера на клиента
+exec gunicorn scheduler.asgi:application \
+    -k uvicorn.workers.UvicornWorker \
+    -b 0.0.0.0:8000 \
+    --workers "${GUNICORN_WORKERS:-2}"
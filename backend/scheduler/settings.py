@@ -4,12 +4,18 @@ Django settings for scheduler project.
 """
 
 import os
+import re
 from pathlib import Path
-from decouple import config
+from decouple import AutoConfig
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# AutoConfig с фиксированным путём: без подъёма по каталогам от CWD
+# при первом обращении (повторяется в каждом воркере gunicorn);
+# содержимое .env decouple кеширует после первого чтения
+config = AutoConfig(search_path=BASE_DIR)
+
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = config('DJANGO_SECRET_KEY', default='django-insecure-change-me')
 
@@ -43,7 +49,7 @@ LOCAL_APPS = [
     'apps.notifications',
 ]
 
-INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
+INSTALLED_APPS = (*DJANGO_APPS, *THIRD_PARTY_APPS, *LOCAL_APPS)
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
@@ -128,6 +134,20 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Статику в обоих режимах отдаёт WhiteNoise (in-memory кеш заголовков,
+# gzip/brotli, ETag), а не по-файловый dev-обработчик Django.
+# В DEBUG файлы находятся через finders без collectstatic
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+WHITENOISE_USE_FINDERS = True
+WHITENOISE_AUTOREFRESH = DEBUG
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -144,17 +164,18 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",  # For MVP, adjust in production
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "apps.core.renderers.ORJSONRenderer",
     ],
+    # Только JSON по умолчанию: multipart-загрузки объявляют свои
+    # parser_classes на конкретных view (upload_plan); каждый лишний
+    # класс - итерация контент-негоциации на каждом запросе
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
-        "rest_framework.parsers.FormParser",
-        "rest_framework.parsers.MultiPartParser",
     ],
+    # SearchFilter подключается точечно на view со search_fields
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
-        "rest_framework.filters.SearchFilter",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 50,
@@ -177,7 +198,9 @@ CORS_ALLOWED_ORIGINS = []
 CORS_ALLOW_ALL_ORIGINS = False
 
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024  # 20MB
+# Файлы крупнее 1 МБ спулятся на диск (TemporaryUploadedFile), а не
+# буферизуются в RAM целиком - важно при параллельных загрузках до 20 МБ
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1 * 1024 * 1024  # 1MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024  # 20MB
 MAX_FILE_SIZE_MB = config('MAX_FILE_SIZE_MB', default=20, cast=int)
 
@@ -209,12 +232,23 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Ограниченный пул соединений с брокером + keepalive: без него каждый
+# publish под нагрузкой может открывать новое TCP-соединение к Redis
+CELERY_BROKER_POOL_LIMIT = 10
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'visibility_timeout': 3600,
+    'socket_keepalive': True,
+}
 CELERY_TASK_ROUTES = {
     'apps.extraction.tasks.*': {'queue': 'extraction'},
     'apps.notifications.tasks.*': {'queue': 'notifications'},
 }
 
 # Logging
+# Каталог логов создаётся на импорте настроек: обработчик не упирается
+# в ENOENT при первом emit, контейнер без прогретого volume не падает
+(BASE_DIR / 'logs').mkdir(exist_ok=True)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -224,35 +258,52 @@ LOGGING = {
             'style': '{',
         },
         'json': {
-            '()': 'pythonjsonlogger.jsonlogger.JsonFormatter',
-            'format': '%(asctime)s %(name)s %(levelname)s %(message)s'
+            # Сериализация записи через orjson (C) вместо pythonjsonlogger
+            '()': 'apps.core.logging.OrjsonFormatter',
         },
     },
     'handlers': {
         'file': {
             'level': 'INFO',
-            'class': 'logging.FileHandler',
+            # Буфер 64 КБ + flush раз в секунду вместо syscall на запись
+            'class': 'apps.core.logging.BufferedFileHandler',
             'filename': BASE_DIR / 'logs' / 'scheduler.log',
             'formatter': 'json',
         },
         'console': {
             'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
+            # Line-buffered stdout: один write() на запись лога
+            'class': 'apps.core.logging.LineBufferedConsoleHandler',
             'formatter': 'verbose',
         },
+        # Пакетирование записей в RAM перед файлом: сброс пачкой при
+        # заполнении, на ERROR или раз в секунду; уровень INFO - чтобы
+        # DEBUG не попадал в буфер в обход уровня файлового обработчика
+        'memory': {
+            'level': 'INFO',
+            '()': 'apps.core.logging.TimedFlushMemoryHandler',
+            'capacity': 512,
+            'target': 'cfg://handlers.file',
+        },
+        # Логгеры кладут записи в очередь, а write() в файл и консоль
+        # выполняет фоновый поток QueueListener - поток запроса не ждёт I/O
+        'queue': {
+            '()': 'apps.core.logging.QueueListenerHandler',
+            'handlers': ['cfg://handlers.console', 'cfg://handlers.memory'],
+        },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'INFO',
             'propagate': False,
         },
         'apps': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
             'level': 'DEBUG',
             'propagate': False,
         },
@@ -275,11 +326,24 @@ CACHES = {
         "LOCATION": f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # Ограничиваем пул соединений на процесс и держим TCP живым;
+            # короткие таймауты не дают запросам виснуть на недоступном Redis
+            "CONNECTION_POOL_KWARGS": {
+                "max_connections": 64,
+                "socket_keepalive": True,
+            },
+            "SOCKET_CONNECT_TIMEOUT": 2,
+            "SOCKET_TIMEOUT": 2,
         },
         "TIMEOUT": None,  # или число секунд
     }
 }
 
+# Сессии в Redis: один GET из пула вместо SELECT+UPDATE в Postgres
+# на каждый запрос с сессией
+SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
+SESSION_CACHE_ALIAS = 'default'
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -290,7 +354,7 @@ if not DEBUG:
     SECURE_HSTS_PRELOAD = True
 
 MINUTES_DIR = os.environ.get("MINUTES_DIR", "/app/data/minutes")
-MINUTES_ALLOWED_EXT = {".txt", ".md", ".docx", ".doc", ".pdf", ".rtf", ".xlsx", ".xls", ".csv"}
+MINUTES_ALLOWED_EXT = frozenset({".txt", ".md", ".docx", ".doc", ".pdf", ".rtf", ".xlsx", ".xls", ".csv"})
 
 FREEZE_DRY_DEFAULT_LINE = "Линия_66"
 
@@ -308,4 +372,20 @@ LINE_SYNONYMS = {
         "66-я",
         "линия 66"
     ]
-}
\ No newline at end of file
+}
+
+# Предкомпилированный поиск синонимов: одна альтернация вместо N проходов
+# `substring in text` по документу. Длинные синонимы первыми, чтобы
+# "freeze-dry линия" не обрезалось до "freeze-dry"
+LINE_SYNONYMS_BY_TEXT = {
+    synonym.lower(): line
+    for line, synonyms in LINE_SYNONYMS.items()
+    for synonym in synonyms
+}
+LINE_SYNONYMS_PATTERN = re.compile(
+    '|'.join(
+        re.escape(synonym)
+        for synonym in sorted(LINE_SYNONYMS_BY_TEXT, key=len, reverse=True)
+    ),
+    re.IGNORECASE,
+) if LINE_SYNONYMS_BY_TEXT else None
\ No newline at end of file
@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.views.decorators.cache import cache_page
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from apps.notifications import views as notification_views
 
@@ -24,12 +25,13 @@ urlpatterns = [
     # API
     path('api/', include(api_patterns)),
     
-    # OpenAPI schema
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    # OpenAPI schema: вывод статичен в рамках деплоя, но drf-spectacular
+    # обходит все сериализаторы при каждой генерации - кешируем на сутки
+    # (инвалидация - сменой VERSION в SPECTACULAR_SETTINGS или деплоем)
+    path('api/schema/', cache_page(60 * 60 * 24)(SpectacularAPIView.as_view()), name='schema'),
+    path('api/docs/', cache_page(60 * 60 * 24)(SpectacularSwaggerView.as_view(url_name='schema')), name='swagger-ui'),
 ]
 
-# Static and media files in development
+# Media files in development; статику и в DEBUG отдаёт WhiteNoise
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -3,6 +3,7 @@
 Создание демонстрационных DOCX файлов с протоколами
 """
 
+import copy
 import sys
 from pathlib import Path
 
@@ -10,13 +11,28 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from docx import Document
-from docx.shared import Inches
+# Шаблон python-docx, разобранный один раз: Document() при каждом вызове
+# заново парсит default-шаблон из zip, deepcopy готового дерева вдвое дешевле
+_template = None
+
+def _new_document():
+    """Новый документ как deepcopy однократно разобранного шаблона"""
+    global _template
+    if _template is None:
+        # Ленивый импорт: python-docx грузится только при реальной генерации
+        from docx import Document
+        _template = Document()
+    return copy.deepcopy(_template)
+
+def _add_speaker(doc, name):
+    """Абзац с именем говорящего жирным шрифтом"""
+    para = doc.add_paragraph()
+    para.add_run(f'{name}:').bold = True
+    return para
 
 def create_minutes_01():
     """Создание minutes_01_discussion.docx"""
-    
-    doc = Document()
+    doc = _new_document()
     
     # Заголовок
     title = doc.add_heading('Переписка 1: Обсуждение сроков производства', 0)
@@ -26,8 +42,7 @@ def create_minutes_01():
     doc.add_paragraph('')
     
     # Алексей
-    alexey_para = doc.add_paragraph()
-    alexey_para.add_run('Алексей:').bold = True
+    _add_speaker(doc, 'Алексей')
     doc.add_paragraph(
         'По заказу A101 есть задержка с материалом от поставщика. Возможен перенос начала с 1 июля на 5 июля. '
         'Как думаешь, успеем к 10 июля?'
@@ -37,8 +52,7 @@ def create_minutes_01():
     doc.add_paragraph('')
     
     # Марина
-    marina_para = doc.add_paragraph()
-    marina_para.add_run('Марина:').bold = True
+    _add_speaker(doc, 'Марина')
     doc.add_paragraph(
         'Алексей, если увеличим скорость линии до 120 ед./день, то успеем. '
         'Но нужно согласовать с руководством.'
@@ -48,8 +62,7 @@ def create_minutes_01():
     doc.add_paragraph('')
     
     # Алексей ответ
-    alexey2_para = doc.add_paragraph()
-    alexey2_para.add_run('Алексей:').bold = True
+    _add_speaker(doc, 'Алексей')
     doc.add_paragraph('Хорошо, я уточню. Дам ответ завтра.')
     
     # Сохраняем файл
@@ -62,8 +75,7 @@ def create_minutes_01():
 
 def create_minutes_02():
     """Создание minutes_02_planned_downtime.docx"""
-    
-    doc = Document()
+    doc = _new_document()
     
     # Заголовок
     title = doc.add_heading('Переписка 2: Утверждение планового простоя', 0)
@@ -73,8 +85,7 @@ def create_minutes_02():
     doc.add_paragraph('')
     
     # Сергей
-    sergey_para = doc.add_paragraph()
-    sergey_para.add_run('Сергей:').bold = True
+    _add_speaker(doc, 'Сергей')
     
     # Основной текст с важной информацией
     main_text = doc.add_paragraph(
@@ -101,8 +112,7 @@ def create_minutes_02():
 
 def create_minutes_03():
     """Создание дополнительного файла с упоминанием линии и синонимов"""
-    
-    doc = Document()
+    doc = _new_document()
     
     # Заголовок
     title = doc.add_heading('Переписка 3: Техническое совещание по линии', 0)
@@ -112,8 +122,7 @@ def create_minutes_03():
     doc.add_paragraph('')
     
     # Игорь
-    igor_para = doc.add_paragraph()
-    igor_para.add_run('Игорь:').bold = True
+    _add_speaker(doc, 'Игорь')
     
     # Текст с упоминанием линии и синонимов
     doc.add_paragraph(
@@ -125,8 +134,7 @@ def create_minutes_03():
     doc.add_paragraph('')
     
     # Анна
-    anna_para = doc.add_paragraph()
-    anna_para.add_run('Анна:').bold = True
+    _add_speaker(doc, 'Анна')
     doc.add_paragraph(
         'Игорь, согласовано. Линия_66 будет остановлена с 15 по 17 сентября. '
         'Все операции по фриз-драй оборудованию выполним в указанные сроки.'
@@ -141,13 +149,19 @@ def create_minutes_03():
 
 if __name__ == "__main__":
     try:
-        created_files = []
-        
-        # Создаем все файлы
-        created_files.append(create_minutes_01())
-        created_files.append(create_minutes_02())
-        created_files.append(create_minutes_03())
-        
+        # Три независимых документа строятся в параллельных процессах:
+        # сериализация lxml - чистый CPU-bound Python, GIL мешает потокам
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Каталог создаётся до запуска воркеров: mkdir внутри билдеров
+        # в параллельном запуске - гонка на свежем checkout
+        (project_root / 'demo' / 'minutes').mkdir(parents=True, exist_ok=True)
+
+        builders = [create_minutes_01, create_minutes_02, create_minutes_03]
+        with ProcessPoolExecutor(max_workers=len(builders)) as executor:
+            futures = [executor.submit(builder) for builder in builders]
+            created_files = [future.result() for future in futures]
+
         print(f"\n✅ Созданы файлы протоколов:")
         for file_path in created_files:
             print(f"   - {file_path}")